@@ -1,20 +1,28 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
+import base64
+import json
 import os
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ecommerce.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///ecommerce.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db = SQLAlchemy(app)
 CORS(app)
 
+ORDER_PAGE_MAX = 100
+BULK_ITEMS_MAX = 100
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -45,6 +53,10 @@ class CartItem(db.Model):
     
     product = db.relationship('Product', backref='cart_items')
 
+    __table_args__ = (
+        db.Index('ix_cart_item_user_product', 'user_id', 'product_id', unique=True),
+    )
+
 class WishlistItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -53,6 +65,10 @@ class WishlistItem(db.Model):
     
     product = db.relationship('Product', backref='wishlist_items')
 
+    __table_args__ = (
+        db.Index('ix_wishlist_item_user_product', 'user_id', 'product_id', unique=True),
+    )
+
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -62,6 +78,10 @@ class Order(db.Model):
     
     order_items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_order_user_created', 'user_id', 'created_at'),
+    )
+
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
@@ -71,6 +91,14 @@ class OrderItem(db.Model):
     
     product = db.relationship('Product', backref='order_items')
 
+class UserOrderSummary(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    lifetime_spend = db.Column(db.Float, nullable=False, default=0.0)
+    last_order_id = db.Column(db.Integer, db.ForeignKey('order.id'))
+    last_order_at = db.Column(db.DateTime)
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -357,28 +385,54 @@ def get_cart(current_user):
         } for item in cart_items]
     })
 
+def require_int(value):
+    """Return value if it is a positive integer; floats, strings and booleans are rejected"""
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f'Expected a positive integer, got {value!r}')
+    return value
+
+def require_list(values):
+    """Return values if it is a list of at most BULK_ITEMS_MAX entries"""
+    if not isinstance(values, list) or len(values) > BULK_ITEMS_MAX:
+        raise ValueError(f'Expected a list of at most {BULK_ITEMS_MAX} entries')
+    return values
+
+def parse_cart_item(item, key='product_id', default_quantity=1):
+    """Validate a {key, 'quantity'} cart entry and return it as an (id, quantity) pair"""
+    if not isinstance(item, dict):
+        raise ValueError('Expected a JSON object')
+    return require_int(item.get(key)), require_int(item.get('quantity', default_quantity))
+
+def unknown_product_ids(product_ids):
+    """Return the ids in product_ids that have no matching product, sorted"""
+    requested = set(product_ids)
+    found = {row[0] for row in db.session.query(Product.id).filter(Product.id.in_(requested))}
+    return sorted(requested - found)
+
+def upsert_cart_items(user_id, items):
+    """Add (product_id, quantity) pairs to a cart in a single INSERT ... ON CONFLICT statement"""
+    stmt = sqlite_insert(CartItem).values([
+        {'user_id': user_id, 'product_id': product_id, 'quantity': quantity}
+        for product_id, quantity in items
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'product_id'],
+        set_={'quantity': CartItem.quantity + stmt.excluded.quantity}
+    )
+    db.session.execute(stmt)
+
 @app.route('/api/cart', methods=['POST'])
 @token_required
 def add_to_cart(current_user):
-    data = request.get_json()
-    product_id = data['product_id']
-    quantity = data.get('quantity', 1)
-    
-    existing_item = CartItem.query.filter_by(
-        user_id=current_user.id, 
-        product_id=product_id
-    ).first()
-    
-    if existing_item:
-        existing_item.quantity += quantity
-    else:
-        cart_item = CartItem(
-            user_id=current_user.id,
-            product_id=product_id,
-            quantity=quantity
-        )
-        db.session.add(cart_item)
+    try:
+        product_id, quantity = parse_cart_item(request.get_json())
+    except ValueError:
+        return jsonify({'message': 'Invalid cart item'}), 400
+    
+    if unknown_product_ids([product_id]):
+        return jsonify({'message': 'Product not found'}), 404
     
+    upsert_cart_items(current_user.id, [(product_id, quantity)])
     db.session.commit()
     return jsonify({'message': 'Item added to cart'}), 201
 
@@ -406,6 +460,57 @@ def remove_from_cart(current_user):
     db.session.commit()
     return jsonify({'message': 'Item removed from cart'})
 
+@app.route('/api/cart/bulk', methods=['POST'])
+@token_required
+def bulk_update_cart(current_user):
+    """Apply 'add', 'update' and 'remove' cart operations in one transaction"""
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Invalid bulk cart payload'}), 400
+    
+    try:
+        add_pairs = [parse_cart_item(item) for item in require_list(data.get('add', []))]
+        update_pairs = [parse_cart_item(item, key='item_id', default_quantity=None)
+                        for item in require_list(data.get('update', []))]
+        remove_ids = [require_int(item_id) for item_id in require_list(data.get('remove', []))]
+    except ValueError:
+        return jsonify({'message': 'Invalid bulk cart payload'}), 400
+    
+    if len(add_pairs) + len(update_pairs) + len(remove_ids) > BULK_ITEMS_MAX:
+        return jsonify({'message': f'At most {BULK_ITEMS_MAX} items per request'}), 400
+    
+    if add_pairs:
+        missing = unknown_product_ids(product_id for product_id, _ in add_pairs)
+        if missing:
+            return jsonify({'message': 'Product not found', 'product_ids': missing}), 400
+        upsert_cart_items(current_user.id, add_pairs)
+    
+    updated = 0
+    if update_pairs:
+        cart_table = CartItem.__table__
+        result = db.session.execute(
+            cart_table.update()
+            .where(cart_table.c.id == bindparam('b_item_id'))
+            .where(cart_table.c.user_id == current_user.id)
+            .values(quantity=bindparam('b_quantity')),
+            [{'b_item_id': item_id, 'b_quantity': quantity} for item_id, quantity in update_pairs]
+        )
+        updated = result.rowcount
+    
+    removed = 0
+    if remove_ids:
+        removed = CartItem.query.filter(
+            CartItem.user_id == current_user.id,
+            CartItem.id.in_(remove_ids)
+        ).delete(synchronize_session=False)
+    
+    db.session.commit()
+    return jsonify({
+        'message': 'Cart updated',
+        'updated': updated,
+        'removed': removed
+    }), 200
+
 @app.route('/api/wishlist', methods=['GET'])
 @token_required
 def get_wishlist(current_user):
@@ -424,26 +529,31 @@ def get_wishlist(current_user):
         } for item in wishlist_items]
     })
 
+def insert_wishlist_items(user_id, product_ids):
+    """Insert products into a wishlist, skipping ones already there; returns the number of new rows"""
+    stmt = sqlite_insert(WishlistItem).values([
+        {'user_id': user_id, 'product_id': product_id, 'created_at': datetime.utcnow()}
+        for product_id in product_ids
+    ]).on_conflict_do_nothing(index_elements=['user_id', 'product_id'])
+    return db.session.execute(stmt).rowcount
+
 @app.route('/api/wishlist', methods=['POST'])
 @token_required
 def add_to_wishlist(current_user):
     data = request.get_json()
-    product_id = data['product_id']
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Invalid wishlist item'}), 400
+    try:
+        product_id = require_int(data.get('product_id'))
+    except ValueError:
+        return jsonify({'message': 'Invalid wishlist item'}), 400
     
-    existing_item = WishlistItem.query.filter_by(
-        user_id=current_user.id, 
-        product_id=product_id
-    ).first()
+    if unknown_product_ids([product_id]):
+        return jsonify({'message': 'Product not found'}), 404
     
-    if existing_item:
+    if not insert_wishlist_items(current_user.id, [product_id]):
         return jsonify({'message': 'Item already in wishlist'}), 400
     
-    wishlist_item = WishlistItem(
-        user_id=current_user.id,
-        product_id=product_id
-    )
-    
-    db.session.add(wishlist_item)
     db.session.commit()
     return jsonify({'message': 'Item added to wishlist'}), 201
 
@@ -458,6 +568,62 @@ def remove_from_wishlist(current_user):
     db.session.commit()
     return jsonify({'message': 'Item removed from wishlist'})
 
+@app.route('/api/wishlist/bulk', methods=['POST'])
+@token_required
+def bulk_update_wishlist(current_user):
+    """Apply 'add' (product ids) and 'remove' (item ids) wishlist operations in one transaction"""
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Invalid bulk wishlist payload'}), 400
+    
+    try:
+        add_ids = [require_int(product_id) for product_id in require_list(data.get('add', []))]
+        remove_ids = [require_int(item_id) for item_id in require_list(data.get('remove', []))]
+    except ValueError:
+        return jsonify({'message': 'Invalid bulk wishlist payload'}), 400
+    
+    if len(add_ids) + len(remove_ids) > BULK_ITEMS_MAX:
+        return jsonify({'message': f'At most {BULK_ITEMS_MAX} items per request'}), 400
+    
+    added = 0
+    if add_ids:
+        missing = unknown_product_ids(add_ids)
+        if missing:
+            return jsonify({'message': 'Product not found', 'product_ids': missing}), 400
+        added = insert_wishlist_items(current_user.id, add_ids)
+    
+    removed = 0
+    if remove_ids:
+        removed = WishlistItem.query.filter(
+            WishlistItem.user_id == current_user.id,
+            WishlistItem.id.in_(remove_ids)
+        ).delete(synchronize_session=False)
+    
+    db.session.commit()
+    return jsonify({'message': 'Wishlist updated', 'added': added, 'removed': removed}), 200
+
+def record_order_in_summary(order, item_count):
+    """Fold a newly placed order into the user's precomputed order summary"""
+    stmt = sqlite_insert(UserOrderSummary).values(
+        user_id=order.user_id,
+        order_count=1,
+        item_count=item_count,
+        lifetime_spend=order.total_amount,
+        last_order_id=order.id,
+        last_order_at=order.created_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id'],
+        set_={
+            'order_count': UserOrderSummary.order_count + 1,
+            'item_count': UserOrderSummary.item_count + stmt.excluded.item_count,
+            'lifetime_spend': UserOrderSummary.lifetime_spend + stmt.excluded.lifetime_spend,
+            'last_order_id': stmt.excluded.last_order_id,
+            'last_order_at': stmt.excluded.last_order_at
+        }
+    )
+    db.session.execute(stmt)
+
 @app.route('/api/orders', methods=['POST'])
 @token_required
 def create_order(current_user):
@@ -473,7 +639,7 @@ def create_order(current_user):
         total_amount=total_amount
     )
     db.session.add(order)
-    db.session.commit()
+    db.session.flush()
     
     for cart_item in cart_items:
         order_item = OrderItem(
@@ -485,30 +651,93 @@ def create_order(current_user):
         db.session.add(order_item)
         db.session.delete(cart_item)
     
+    record_order_in_summary(order, len(cart_items))
     db.session.commit()
     return jsonify({'message': 'Order created successfully', 'order_id': order.id}), 201
 
+def encode_order_cursor(order):
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_order_cursor(cursor):
+    created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(order_id)
+
+def fetch_orders_page(user_id, limit, cursor=None):
+    """Return up to `limit` orders older than `cursor`, newest first, keyed on (created_at, id)"""
+    query = Order.query.filter(Order.user_id == user_id).options(
+        selectinload(Order.order_items).joinedload(OrderItem.product)
+    )
+    if cursor:
+        created_at, order_id = cursor
+        query = query.filter(db.or_(
+            Order.created_at < created_at,
+            db.and_(Order.created_at == created_at, Order.id < order_id)
+        ))
+    return query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit).all()
+
+def serialize_order(order):
+    return {
+        'id': order.id,
+        'total_amount': order.total_amount,
+        'status': order.status,
+        'created_at': order.created_at.isoformat(),
+        'items': [{
+            'id': item.id,
+            'product': {
+                'id': item.product.id,
+                'name': item.product.name,
+                'category': item.product.category
+            },
+            'quantity': item.quantity,
+            'price': item.price
+        } for item in order.order_items]
+    }
+
 @app.route('/api/orders', methods=['GET'])
 @token_required
 def get_orders(current_user):
-    orders = Order.query.filter_by(user_id=current_user.id).order_by(Order.created_at.desc()).all()
+    user_id = current_user.id
+    
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            cursor = None
+            while True:
+                orders = fetch_orders_page(user_id, ORDER_PAGE_MAX, cursor)
+                for order in orders:
+                    yield json.dumps(serialize_order(order)) + '\n'
+                if len(orders) < ORDER_PAGE_MAX:
+                    break
+                cursor = (orders[-1].created_at, orders[-1].id)
+                db.session.expunge_all()
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), ORDER_PAGE_MAX)
+    cursor = request.args.get('cursor')
+    try:
+        cursor = decode_order_cursor(cursor) if cursor else None
+    except (ValueError, UnicodeDecodeError):
+        return jsonify({'message': 'Invalid cursor'}), 400
+    
+    orders = fetch_orders_page(user_id, limit + 1, cursor)
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+    
+    return jsonify({
+        'orders': [serialize_order(order) for order in orders],
+        'next_cursor': encode_order_cursor(orders[-1]) if has_more else None
+    })
+
+@app.route('/api/orders/summary', methods=['GET'])
+@token_required
+def get_order_summary(current_user):
+    summary = UserOrderSummary.query.get(current_user.id)
     return jsonify({
-        'orders': [{
-            'id': order.id,
-            'total_amount': order.total_amount,
-            'status': order.status,
-            'created_at': order.created_at.isoformat(),
-            'items': [{
-                'id': item.id,
-                'product': {
-                    'id': item.product.id,
-                    'name': item.product.name,
-                    'category': item.product.category
-                },
-                'quantity': item.quantity,
-                'price': item.price
-            } for item in order.order_items]
-        } for order in orders]
+        'order_count': summary.order_count if summary else 0,
+        'item_count': summary.item_count if summary else 0,
+        'lifetime_spend': summary.lifetime_spend if summary else 0.0,
+        'last_order_id': summary.last_order_id if summary else None,
+        'last_order_at': summary.last_order_at.isoformat() if summary and summary.last_order_at else None
     })
 
 @app.route('/api/recommendations', methods=['GET'])
@@ -549,6 +778,54 @@ def get_categories():
 def health_check():
     return jsonify({'status': 'healthy', 'message': 'Backend API is running with expanded catalog'})
 
+def merge_duplicate_rows(table):
+    """Collapse duplicate (user_id, product_id) rows in cart_item or wishlist_item into the oldest one"""
+    if table == 'cart_item':
+        db.session.execute(text(
+            "UPDATE cart_item SET quantity = (SELECT SUM(c.quantity) FROM cart_item c "
+            "WHERE c.user_id = cart_item.user_id AND c.product_id = cart_item.product_id) "
+            "WHERE id IN (SELECT MIN(id) FROM cart_item GROUP BY user_id, product_id HAVING COUNT(*) > 1)"
+        ))
+    db.session.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY user_id, product_id)"
+    ))
+    db.session.commit()
+
+def backfill_order_summaries():
+    """Build user_order_summary rows from the order history for users that have none"""
+    db.session.execute(text(
+        'INSERT INTO user_order_summary '
+        '(user_id, order_count, item_count, lifetime_spend, last_order_id, last_order_at) '
+        'SELECT o.user_id, COUNT(*), '
+        '(SELECT COUNT(*) FROM order_item oi JOIN "order" o2 ON oi.order_id = o2.id WHERE o2.user_id = o.user_id), '
+        'SUM(o.total_amount), '
+        '(SELECT o3.id FROM "order" o3 WHERE o3.user_id = o.user_id ORDER BY o3.created_at DESC, o3.id DESC LIMIT 1), '
+        'MAX(o.created_at) '
+        'FROM "order" o WHERE o.user_id NOT IN (SELECT user_id FROM user_order_summary) '
+        'GROUP BY o.user_id'
+    ))
+    db.session.commit()
+
+def migrate_existing_db():
+    """Create missing tables and bring databases from older versions up to date:
+    duplicate cart/wishlist rows are merged before their unique index is added, and
+    order summaries are backfilled while the summary table is still empty"""
+    db.create_all()
+    
+    inspector = inspect(db.engine)
+    for model in (CartItem, WishlistItem, Order):
+        table = model.__table__.name
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        for index in model.__table__.indexes:
+            if index.name in existing:
+                continue
+            if index.unique:
+                merge_duplicate_rows(table)
+            index.create(db.engine)
+    
+    if db.session.query(UserOrderSummary.user_id).first() is None and db.session.query(Order.id).first():
+        backfill_order_summaries()
+
 def init_sample_data():
     # Clear existing products and re-initialize with expanded catalog
     existing_count = Product.query.count()
@@ -636,7 +913,7 @@ def init_sample_data():
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        migrate_existing_db()
         init_sample_data()
     
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+
+import pytest
+
+from app import app as flask_app, db, Product
+
+
+@pytest.fixture
+def client():
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([
+            Product(name='Wireless Headphones', price=100.0, category='Electronics', stock=10),
+            Product(name='Coffee Maker', price=50.0, category='Home & Kitchen', stock=10),
+            Product(name='Yoga Mat', price=25.0, category='Sports & Fitness', stock=10),
+        ])
+        db.session.commit()
+    return flask_app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    client.post('/api/register', json={'email': 'test@example.com', 'password': 'secret', 'name': 'Test'})
+    token = client.post('/api/login', json={'email': 'test@example.com', 'password': 'secret'}).json['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def app_context():
+    with flask_app.app_context():
+        yield
@@ -0,0 +1,147 @@
+from sqlalchemy import text
+
+from app import db, CartItem, WishlistItem, BULK_ITEMS_MAX, migrate_existing_db
+
+
+def cart_quantities(client, headers):
+    items = client.get('/api/cart', headers=headers).json['cart_items']
+    return {item['product']['id']: item['quantity'] for item in items}
+
+
+def test_add_to_cart_merges_into_existing_row(client, auth_headers):
+    client.post('/api/cart', json={'product_id': 1, 'quantity': 2}, headers=auth_headers)
+    client.post('/api/cart', json={'product_id': 1}, headers=auth_headers)
+
+    assert cart_quantities(client, auth_headers) == {1: 3}
+
+
+def test_add_to_cart_rejects_unknown_product(client, auth_headers):
+    response = client.post('/api/cart', json={'product_id': 999}, headers=auth_headers)
+
+    assert response.status_code == 404
+    assert cart_quantities(client, auth_headers) == {}
+
+
+def test_bulk_cart_applies_all_operations(client, auth_headers):
+    client.post('/api/cart', json={'product_id': 1}, headers=auth_headers)
+    client.post('/api/cart', json={'product_id': 3}, headers=auth_headers)
+    items = client.get('/api/cart', headers=auth_headers).json['cart_items']
+    item_ids = {item['product']['id']: item['id'] for item in items}
+
+    response = client.post('/api/cart/bulk', json={
+        'add': [{'product_id': 1}, {'product_id': 2, 'quantity': 2}, {'product_id': 2}],
+        'update': [{'item_id': item_ids[3], 'quantity': 5}],
+        'remove': []
+    }, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json['updated'] == 1
+    assert cart_quantities(client, auth_headers) == {1: 2, 2: 3, 3: 5}
+
+    response = client.post('/api/cart/bulk', json={'remove': [item_ids[1], item_ids[3]]}, headers=auth_headers)
+
+    assert response.json['removed'] == 2
+    assert cart_quantities(client, auth_headers) == {2: 3}
+
+
+def test_add_to_cart_rejects_malformed_items(client, auth_headers):
+    for payload in ({'product_id': [1]}, {'product_id': '1'}, {'product_id': 1, 'quantity': 0},
+                    {'product_id': 1, 'quantity': -5}, {'product_id': 1, 'quantity': 2.9}, [1]):
+        response = client.post('/api/cart', json=payload, headers=auth_headers)
+        assert response.status_code == 400
+
+    for payload in ({'product_id': '1'}, {'product_id': True}, [1]):
+        response = client.post('/api/wishlist', json=payload, headers=auth_headers)
+        assert response.status_code == 400
+
+    assert cart_quantities(client, auth_headers) == {}
+
+
+def test_bulk_cart_rejects_unknown_product(client, auth_headers):
+    response = client.post('/api/cart/bulk', json={
+        'add': [{'product_id': 1}, {'product_id': 999}]
+    }, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json['product_ids'] == [999]
+    assert cart_quantities(client, auth_headers) == {}
+
+
+def test_bulk_cart_rejects_non_positive_quantity(client, auth_headers):
+    client.post('/api/cart', json={'product_id': 1}, headers=auth_headers)
+    item_id = client.get('/api/cart', headers=auth_headers).json['cart_items'][0]['id']
+
+    for payload in ({'add': [{'product_id': 2, 'quantity': 0}]},
+                    {'update': [{'item_id': item_id, 'quantity': -3}]}):
+        response = client.post('/api/cart/bulk', json=payload, headers=auth_headers)
+        assert response.status_code == 400
+
+    assert cart_quantities(client, auth_headers) == {1: 1}
+
+
+def test_bulk_endpoints_require_lists_of_ints(client, auth_headers):
+    for payload in ({'add': [{'product_id': 1, 'quantity': 2.9}]},
+                    {'add': [{'product_id': '1'}]},
+                    {'add': {'product_id': 1}},
+                    {'remove': '12'}):
+        response = client.post('/api/cart/bulk', json=payload, headers=auth_headers)
+        assert response.status_code == 400
+
+    for payload in ({'add': '12'}, {'add': [1.5]}, {'remove': [True]}):
+        response = client.post('/api/wishlist/bulk', json=payload, headers=auth_headers)
+        assert response.status_code == 400
+
+    assert cart_quantities(client, auth_headers) == {}
+    assert client.get('/api/wishlist', headers=auth_headers).json['wishlist_items'] == []
+
+
+def test_bulk_endpoints_cap_batch_size(client, auth_headers):
+    response = client.post('/api/cart/bulk', json={
+        'add': [{'product_id': 1}] * (BULK_ITEMS_MAX // 2 + 1),
+        'remove': [1] * (BULK_ITEMS_MAX // 2)
+    }, headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.post('/api/wishlist/bulk', json={'add': [1] * (BULK_ITEMS_MAX + 1)}, headers=auth_headers)
+    assert response.status_code == 400
+
+    assert cart_quantities(client, auth_headers) == {}
+
+
+def test_bulk_endpoints_reject_non_object_body(client, auth_headers):
+    for url in ('/api/cart/bulk', '/api/wishlist/bulk'):
+        response = client.post(url, json=[1], headers=auth_headers)
+        assert response.status_code == 400
+
+
+def test_bulk_wishlist_counts_new_rows(client, auth_headers):
+    client.post('/api/wishlist', json={'product_id': 1}, headers=auth_headers)
+
+    response = client.post('/api/wishlist/bulk', json={'add': [1, 2, 2, 3]}, headers=auth_headers)
+
+    assert response.json['added'] == 2
+    assert len(client.get('/api/wishlist', headers=auth_headers).json['wishlist_items']) == 3
+
+    response = client.post('/api/wishlist/bulk', json={'add': [999]}, headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_migrate_existing_db_merges_duplicate_rows(client, auth_headers, app_context):
+    db.session.execute(text('DROP INDEX ix_cart_item_user_product'))
+    db.session.execute(text('DROP INDEX ix_wishlist_item_user_product'))
+    db.session.add_all([
+        CartItem(user_id=1, product_id=1, quantity=2),
+        CartItem(user_id=1, product_id=1, quantity=3),
+        CartItem(user_id=1, product_id=2, quantity=1),
+        WishlistItem(user_id=1, product_id=1),
+        WishlistItem(user_id=1, product_id=1),
+    ])
+    db.session.commit()
+
+    migrate_existing_db()
+
+    assert sorted((item.product_id, item.quantity) for item in CartItem.query.all()) == [(1, 5), (2, 1)]
+    assert WishlistItem.query.count() == 1
+    index_names = {row[0] for row in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert {'ix_cart_item_user_product', 'ix_wishlist_item_user_product'} <= index_names
@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app import db, Order, OrderItem, UserOrderSummary, ORDER_PAGE_MAX, backfill_order_summaries, migrate_existing_db
+
+
+def add_orders(count, created_at=None, user_id=1):
+    created_at = created_at or datetime(2025, 1, 1)
+    db.session.add_all([
+        Order(user_id=user_id, total_amount=10.0, created_at=created_at) for _ in range(count)
+    ])
+    db.session.commit()
+
+
+def test_create_order_updates_summary(client, auth_headers):
+    client.post('/api/cart/bulk', json={'add': [{'product_id': 1, 'quantity': 2}, {'product_id': 2}]},
+                headers=auth_headers)
+    client.post('/api/orders', headers=auth_headers)
+    client.post('/api/cart', json={'product_id': 3}, headers=auth_headers)
+    order_id = client.post('/api/orders', headers=auth_headers).json['order_id']
+
+    summary = client.get('/api/orders/summary', headers=auth_headers).json
+
+    assert summary['order_count'] == 2
+    assert summary['item_count'] == 3
+    assert summary['lifetime_spend'] == 275.0
+    assert summary['last_order_id'] == order_id
+    assert summary['last_order_at'] is not None
+
+
+def test_summary_for_user_without_orders(client, auth_headers):
+    summary = client.get('/api/orders/summary', headers=auth_headers).json
+
+    assert summary['order_count'] == 0
+    assert summary['last_order_id'] is None
+
+
+def test_orders_paginate_across_tied_timestamps(client, auth_headers, app_context):
+    add_orders(2, datetime(2025, 1, 2))
+    add_orders(5, datetime(2025, 1, 1))
+
+    seen = []
+    cursor = None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/api/orders', query_string=params, headers=auth_headers).json
+        seen.extend(order['id'] for order in page['orders'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == [2, 1, 7, 6, 5, 4, 3]
+
+
+def test_orders_rejects_invalid_cursor(client, auth_headers):
+    response = client.get('/api/orders', query_string={'cursor': 'not-a-cursor'}, headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_orders_ndjson_streams_every_batch(client, auth_headers, app_context):
+    total = ORDER_PAGE_MAX * 2 + 50
+    add_orders(total)
+
+    response = client.get('/api/orders', query_string={'format': 'ndjson'}, headers=auth_headers)
+    ids = [json.loads(line)['id'] for line in response.data.decode().splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert ids == list(range(total, 0, -1))
+
+
+def test_migrate_existing_db_backfills_summaries(client, auth_headers, app_context):
+    db.session.execute(text('DROP TABLE user_order_summary'))
+    add_orders(2, datetime(2025, 1, 1))
+    add_orders(1, datetime(2025, 1, 3))
+    db.session.add(OrderItem(order_id=3, product_id=1, quantity=1, price=10.0))
+    db.session.commit()
+
+    migrate_existing_db()
+
+    summary = db.session.get(UserOrderSummary, 1)
+    assert summary.order_count == 3
+    assert summary.item_count == 1
+    assert summary.lifetime_spend == 30.0
+    assert summary.last_order_id == 3
+
+
+def test_migrate_existing_db_backfills_empty_summary_table(client, auth_headers, app_context):
+    add_orders(2, datetime(2025, 1, 1))
+
+    migrate_existing_db()
+    backfill_order_summaries()
+
+    assert UserOrderSummary.query.count() == 1
+    assert db.session.get(UserOrderSummary, 1).order_count == 2
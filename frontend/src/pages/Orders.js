@@ -8,7 +8,10 @@ const Orders = () => {
   const { isAuthenticated } = useAuth();
   const navigate = useNavigate();
   const [orders, setOrders] = useState([]);
+  const [summary, setSummary] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [message, setMessage] = useState('');
 
   useEffect(() => {
@@ -17,12 +20,14 @@ const Orders = () => {
       return;
     }
     fetchOrders();
+    fetchSummary();
   }, [isAuthenticated, navigate]);
 
   const fetchOrders = async () => {
     try {
       const response = await axios.get('http://localhost:5000/api/orders');
       setOrders(response.data.orders || []);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error fetching orders:', error);
       setMessage('Error loading orders');
@@ -31,6 +36,31 @@ const Orders = () => {
     }
   };
 
+  const fetchSummary = async () => {
+    try {
+      const response = await axios.get('http://localhost:5000/api/orders/summary');
+      setSummary(response.data);
+    } catch (error) {
+      console.error('Error fetching order summary:', error);
+    }
+  };
+
+  const fetchMoreOrders = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await axios.get('http://localhost:5000/api/orders', {
+        params: { cursor: nextCursor }
+      });
+      setOrders(prevOrders => [...prevOrders, ...(response.data.orders || [])]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Error fetching more orders:', error);
+      setMessage('Error loading orders');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const formatDate = (dateString) => {
     const date = new Date(dateString);
     return date.toLocaleDateString('en-US', {
@@ -151,24 +181,26 @@ const Orders = () => {
         </div>
       ) : (
         <>
-          <div className="orders-stats">
-            <div className="stat-item">
-              <span className="stat-number">{orders.length}</span>
-              <span className="stat-label">Total Orders</span>
-            </div>
-            <div className="stat-item">
-              <span className="stat-number">
-                ${orders.reduce((sum, order) => sum + order.total_amount, 0).toFixed(2)}
-              </span>
-              <span className="stat-label">Total Spent</span>
-            </div>
-            <div className="stat-item">
-              <span className="stat-number">
-                {orders.reduce((sum, order) => sum + order.items.length, 0)}
-              </span>
-              <span className="stat-label">Items Ordered</span>
+          {summary && (
+            <div className="orders-stats">
+              <div className="stat-item">
+                <span className="stat-number">{summary.order_count}</span>
+                <span className="stat-label">Total Orders</span>
+              </div>
+              <div className="stat-item">
+                <span className="stat-number">
+                  ${summary.lifetime_spend.toFixed(2)}
+                </span>
+                <span className="stat-label">Total Spent</span>
+              </div>
+              <div className="stat-item">
+                <span className="stat-number">
+                  {summary.item_count}
+                </span>
+                <span className="stat-label">Items Ordered</span>
+              </div>
             </div>
-          </div>
+          )}
           
           <div className="orders-list">
             {orders.map(order => (
@@ -176,6 +208,18 @@ const Orders = () => {
             ))}
           </div>
           
+          {nextCursor && (
+            <div className="orders-footer">
+              <button 
+                onClick={fetchMoreOrders}
+                className="btn btn-outline"
+                disabled={loadingMore}
+              >
+                {loadingMore ? 'Loading...' : 'Load More Orders'}
+              </button>
+            </div>
+          )}
+          
           <div className="orders-footer">
             <button 
               onClick={() => navigate('/products')}